@@ -19,8 +19,9 @@ _shared_resources = {
     ),
 
     # medium assets – chunked raws / single clean
+    # (raw chunks use smaller row groups so CLEAN-side filters can skip them by stats)
     "raw_medium_io_manager": polars_parquet_io_manager.configured(
-        {"base_dir": RAW_LAKE_PATH, "mode": "flat_chunk"}
+        {"base_dir": RAW_LAKE_PATH, "mode": "flat_chunk", "row_group_size": 100_000}
     ),
     "clean_medium_io_manager": polars_parquet_io_manager.configured(
         {"base_dir": CLEAN_LAKE_PATH, "mode": "single"}
@@ -28,7 +29,7 @@ _shared_resources = {
 
     # large assets – hive-partitioned raws *and* cleans
     "raw_large_io_manager": polars_parquet_io_manager.configured(
-        {"base_dir": RAW_LAKE_PATH, "mode": "hive_chunk"}
+        {"base_dir": RAW_LAKE_PATH, "mode": "hive_chunk", "row_group_size": 100_000}
     ),
     "clean_large_io_manager": polars_parquet_io_manager.configured(
         {"base_dir": CLEAN_LAKE_PATH, "mode": "hive_chunk"}
@@ -42,30 +42,28 @@ def _mta_hourly_enhance(lf: pl.LazyFrame) -> pl.LazyFrame:
     """
     t = pl.col("transit_timestamp").cast(pl.Datetime, strict=False)
 
-    # PASS 1: base fields directly from the (NY-local, naive) timestamp
+    dow      = (t.dt.weekday() + 1) % 7                                # 0=Sun..6=Sat
+    day_date = t.dt.date()                                             # DATE
+
+    # Single pass: every field derives directly from the (NY-local, naive) timestamp,
+    # including the Sunday-anchored week start (stays DATE)
     lf = lf.with_columns([
         t.dt.hour().alias("hour_of_day"),
-        ((t.dt.weekday() + 1) % 7).alias("dow"),                       # 0=Sun..6=Sat
-        t.dt.date().alias("day_date"),                                 # DATE
+        dow.alias("dow"),
+        day_date.alias("day_date"),
+        (day_date - pl.duration(days=dow)).alias("week_start_date"),
         pl.date(t.dt.year(), t.dt.month(), pl.lit(1)).alias("month_start_date"),
         t.dt.year().alias("year_num"),
         t.dt.month().alias("month_num"),
     ])
 
-    # PASS 2: week start date (Sunday anchor) using previously created columns (stays DATE)
-    lf = lf.with_columns(
-        (pl.col("day_date") - pl.duration(days=pl.col("dow"))).alias("week_start_date")
-    )
-
-    # Optional tidy ordering
-    cols = lf.collect_schema().names()
-    front = [c for c in [
+    # Optional tidy ordering: every front column was just created above, so the
+    # rest can be selected by exclusion without resolving the schema again
+    front = [
         "day_date", "week_start_date", "month_start_date",
-        "year_num", "month_num", "hour_of_day", "dow"
-    ] if c in cols]
-    rest = [c for c in cols if c not in front]
-    return lf.select(front + rest)
-
+        "year_num", "month_num", "hour_of_day", "dow",
+    ]
+    return lf.select(*front, pl.exclude(front))
 
 
 # Build the RAW and CLEAN assets. The CLEAN output will include the mta_base fields.
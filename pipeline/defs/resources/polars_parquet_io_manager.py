@@ -1,9 +1,13 @@
 import os
-from functools import cached_property
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property, lru_cache, singledispatchmethod
 from typing import Literal, Optional
 
 import polars as pl
+import pyarrow.parquet as pq
 from dagster import (
+    Field,
     IOManager,
     io_manager,
     ConfigurableResource,
@@ -11,6 +15,7 @@ from dagster import (
     OutputContext,
     get_dagster_logger,
 )
+from pydantic import PrivateAttr
 
 
 class PolarsParquetIOManager(IOManager, ConfigurableResource):
@@ -34,6 +39,19 @@ class PolarsParquetIOManager(IOManager, ConfigurableResource):
     # Resource configuration
     base_dir: str
     mode: Literal["single", "flat_chunk", "hive_chunk"] = "single"
+    row_group_size: int = 512_000          # rows per parquet row group
+    statistics: bool = True                # min/max/null-count footer stats (row-group skipping)
+    compression_level: int = 1             # zstd level: 1 = write-optimized ingest, 3+ = smaller files
+    max_concurrent_writes: int = 4         # background writers for submit_chunk (hive_chunk)
+
+    # directories already created by this manager (skip repeat makedirs per chunk)
+    _known_dirs: set[str] = PrivateAttr(default_factory=set)
+
+    # lazily-created writer pool + in-flight writes (submit_chunk / wait_for_writes)
+    _executor: Optional[ThreadPoolExecutor] = PrivateAttr(default=None)
+    _executor_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _pending: list[Future] = PrivateAttr(default_factory=list)
+    _pending_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
 
     # Dagster logger
     @cached_property
@@ -41,12 +59,82 @@ class PolarsParquetIOManager(IOManager, ConfigurableResource):
         return get_dagster_logger()
 
     # ------------------------------------------------------------------ #
+    @staticmethod
+    def _all_null_cols_from_stats(path: str) -> set[str] | None:
+        """
+        All-NULL top-level columns of the parquet file at `path`, read from
+        row-group null_count statistics (footer only, no values decoded).
+        Returns None when any column chunk lacks null-count statistics.
+
+        Statistics are kept per leaf ("loc.y", "tags.list.element"), and a
+        nested leaf's null count says nothing about its top-level column (list
+        leaves even count per element), so only flat columns – whose single
+        leaf path is the column name itself – are ever reported.
+        """
+        meta = pq.read_metadata(path)
+        nulls: dict[str, int] = {}
+        for rg in range(meta.num_row_groups):
+            row_group = meta.row_group(rg)
+            for i in range(row_group.num_columns):
+                col = row_group.column(i)
+                stats = col.statistics
+                if stats is None or not stats.has_null_count:
+                    return None
+                name = col.path_in_schema
+                nulls[name] = nulls.get(name, 0) + stats.null_count
+
+        leaves: dict[str, list[str]] = {}
+        for leaf in nulls:
+            leaves.setdefault(leaf.split(".")[0], []).append(leaf)
+        return {
+            top for top, paths in leaves.items()
+            if paths == [top] and nulls[top] >= meta.num_rows
+        }
+
     @staticmethod
     def _drop_all_null_columns(df: pl.DataFrame) -> pl.DataFrame:
         """Remove columns that are entirely NULL (saves space & avoids dict-0 bug)."""
-        keep = [c for c in df.columns if df[c].null_count() < df.height]
+        # one null_count() kernel over every column instead of a per-column loop
+        null_counts = df.null_count().row(0)
+        keep = [c for c, nc in zip(df.columns, null_counts) if nc < df.height]
         return df.select(keep)
 
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _read_parquet_cached(path: str, mtime_ns: int, size: int) -> pl.DataFrame:
+        """
+        Eager parquet read shared across load_input() calls in this process.
+        mtime/size are part of the key so a rewritten file is never served stale.
+        """
+        return pl.scan_parquet(path).collect(engine="streaming")
+
+    # ------------------------------------------------------------------ #
+    @property
+    def _parquet_opts(self) -> dict:
+        """Shared writer options for write_parquet / sink_parquet."""
+        return {
+            "compression": "zstd",
+            "compression_level": self.compression_level,
+            "statistics": self.statistics,
+            "row_group_size": self.row_group_size,
+        }
+
+    def _write_df(self, df: pl.DataFrame, path: str) -> None:
+        """Native Rust writer first; pyarrow only for frames it cannot encode."""
+        try:
+            df.write_parquet(path, **self._parquet_opts)
+        except (pl.exceptions.ComputeError, pl.exceptions.PanicException) as exc:
+            self._log.warning(f"native parquet write failed ({exc}); retrying via pyarrow → {path}")
+            df.write_parquet(path, use_pyarrow=True, **self._parquet_opts)
+
+    # ------------------------------------------------------------------ #
+    def _ensure_dir(self, path: str) -> None:
+        dirpath = os.path.dirname(path)
+        if dirpath not in self._known_dirs:
+            os.makedirs(dirpath, exist_ok=True)
+            self._known_dirs.add(dirpath)
+
     # ------------------------------------------------------------------ #
     def _path(
         self,
@@ -79,47 +167,167 @@ class PolarsParquetIOManager(IOManager, ConfigurableResource):
         self,
         asset_name: str,
         batch_num: int,
-        df: pl.DataFrame,
+        df: pl.DataFrame | pl.LazyFrame,
         *,
         year: int | None = None,
         month: int | None = None,
     ) -> None:
+        if isinstance(df, pl.LazyFrame):
+            self.write_chunk_lazy(asset_name, batch_num, df, year=year, month=month)
+            return
+
         if self.mode == "single":
             raise RuntimeError("write_chunk() not available in 'single' mode")
 
         path = self._path(asset=asset_name, batch=batch_num, year=year, month=month)
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._ensure_dir(path)
 
         cleaned = self._drop_all_null_columns(df)
-        cleaned.write_parquet(path, compression="zstd", use_pyarrow=True)
+        self._write_df(cleaned, path)
 
         self._log.info(f"[{self.mode}] wrote {cleaned.shape[0]:,} rows → {path}")
 
+    def write_chunk_lazy(
+        self,
+        asset_name: str,
+        batch_num: int,
+        lf: pl.LazyFrame,
+        *,
+        year: int | None = None,
+        month: int | None = None,
+    ) -> None:
+        """
+        Stream a LazyFrame chunk to parquet with sink_parquet, so the partition
+        is written batch by batch and never fully materialized; the sink is the
+        only execution of `lf`. All-NULL columns are then found from the written
+        footer's null counts, and only if there are any is the (already
+        transformed) file rewritten without them. Plans the streaming sink
+        cannot execute fall back to collect(engine="streaming").
+        """
+        if self.mode == "single":
+            raise RuntimeError("write_chunk_lazy() not available in 'single' mode")
+
+        path = self._path(asset=asset_name, batch=batch_num, year=year, month=month)
+        self._ensure_dir(path)
+
+        try:
+            lf.sink_parquet(path, **self._parquet_opts)
+        except pl.exceptions.InvalidOperationError as exc:
+            self._log.warning(f"[{self.mode}] plan not streamable ({exc}); collecting → {path}")
+            self._write_df(self._drop_all_null_columns(lf.collect(engine="streaming")), path)
+        else:
+            self._drop_all_null_columns_on_disk(path)
+        self._log.info(f"[{self.mode}] streamed → {path}")
+
+    def _drop_all_null_columns_on_disk(self, path: str) -> None:
+        """
+        Rewrite the parquet file at `path` without its all-NULL columns, judged
+        from footer statistics. No-op (no rewrite) when none are all-NULL, or
+        when the file was written without statistics.
+        """
+        lf = pl.scan_parquet(path)
+        # only drop names that really are top-level columns of the written file
+        from_stats = self._all_null_cols_from_stats(path) or set()
+        all_null = sorted(from_stats & set(lf.collect_schema().names()))
+        if not all_null:
+            return
+
+        tmp = path + ".tmp"
+        lf.drop(all_null).sink_parquet(tmp, **self._parquet_opts)
+        os.replace(tmp, path)
+        self._log.info(f"[{self.mode}] dropped {len(all_null)} all-NULL columns: {all_null}")
+
+    # ------------------------------------------------------------------ #
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrent_writes,
+                        thread_name_prefix="parquet-writer",
+                    )
+        return self._executor
+
+    def submit_chunk(
+        self,
+        asset_name: str,
+        batch_num: int,
+        df: pl.DataFrame | pl.LazyFrame,
+        *,
+        year: int | None = None,
+        month: int | None = None,
+    ) -> None:
+        """
+        Queue write_chunk() on a background thread (hive_chunk mode).
+
+        Each chunk targets its own file, so writers never contend. At most
+        `max_concurrent_writes` chunks are in flight; beyond that the caller
+        blocks on the oldest write. Call wait_for_writes() before the asset
+        returns. Other modes (or max_concurrent_writes <= 1) write inline.
+        Safe to call from several fetch threads at once.
+        """
+        if self.mode != "hive_chunk" or self.max_concurrent_writes <= 1:
+            self.write_chunk(asset_name, batch_num, df, year=year, month=month)
+            return
+
+        oldest: Future | None = None
+        with self._pending_lock:
+            if len(self._pending) >= self.max_concurrent_writes:
+                oldest = self._pending.pop(0)
+        if oldest is not None:
+            oldest.result()
+
+        fut = self._get_executor().submit(
+            self.write_chunk, asset_name, batch_num, df, year=year, month=month
+        )
+        with self._pending_lock:
+            self._pending.append(fut)
+
+    def wait_for_writes(self) -> None:
+        """Block until every submitted chunk is on disk (re-raises writer errors)."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        for fut in pending:
+            fut.result()
+
+    def shutdown(self) -> None:
+        """Flush in-flight writes and stop the writer pool."""
+        try:
+            self.wait_for_writes()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
     # ------------------------------------------------------------------ #
     def write_single(self, asset_name: str, obj: pl.DataFrame | pl.LazyFrame) -> None:
         if self.mode != "single":
             raise RuntimeError("write_single() only valid in 'single' mode")
 
         path = self._path(asset=asset_name)
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._ensure_dir(path)
+        self._write_single_obj(obj, path)
 
-        if isinstance(obj, pl.LazyFrame):
-            # STREAM write directly from LazyFrame → constant memory footprint
-            obj.sink_parquet(path, compression="zstd")
-            self._log.info(f"[single] streamed {path}")
-            return
+    # type-dispatched writers for write_single(); register more types here
+    @singledispatchmethod
+    def _write_single_obj(self, obj, path: str) -> None:
+        raise TypeError("Only Polars (Lazy)DataFrame objects are supported")
 
-        if isinstance(obj, pl.DataFrame):
-            cleaned = self._drop_all_null_columns(obj)
-            cleaned.write_parquet(path, compression="zstd", use_pyarrow=True)
+    @_write_single_obj.register(pl.LazyFrame)
+    def _write_single_lazy(self, obj: pl.LazyFrame, path: str) -> None:
+        # STREAM write directly from LazyFrame → constant memory footprint
+        obj.sink_parquet(path, **self._parquet_opts)
+        self._log.info(f"[single] streamed {path}")
 
-            removed = set(obj.columns) - set(cleaned.columns)
-            if removed:
-                self._log.info(f"[single] dropped {len(removed)} all-NULL columns: {sorted(removed)}")
-            self._log.info(f"[single] wrote {path}")
-            return
+    @_write_single_obj.register(pl.DataFrame)
+    def _write_single_df(self, obj: pl.DataFrame, path: str) -> None:
+        cleaned = self._drop_all_null_columns(obj)
+        self._write_df(cleaned, path)
 
-        raise TypeError("Only Polars (Lazy)DataFrame objects are supported")
+        removed = set(obj.columns) - set(cleaned.columns)
+        if removed:
+            self._log.info(f"[single] dropped {len(removed)} all-NULL columns: {sorted(removed)}")
+        self._log.info(f"[single] wrote {path}")
 
     # ------------------------------------------------------------------ #
     # Dagster glue
@@ -130,6 +338,13 @@ class PolarsParquetIOManager(IOManager, ConfigurableResource):
             context.log.debug(f"[{self.mode}] chunks already on disk – no-op")
 
     def load_input(self, context: InputContext):
+        """
+        Scan the upstream parquet. Inputs declared with
+        ``AssetIn(metadata={"lazy": True})`` receive the LazyFrame itself so the
+        consumer's plan can push projections/predicates into the scan; all other
+        inputs get a DataFrame collected with the streaming engine and cached
+        (keyed on path + mtime + size) for repeat loads of the same upstream.
+        """
         if self.mode != "single":
             raise NotImplementedError("load_input() only implemented for 'single' mode")
 
@@ -137,7 +352,12 @@ class PolarsParquetIOManager(IOManager, ConfigurableResource):
         if not os.path.exists(path):
             raise FileNotFoundError(path)
 
-        df = pl.read_parquet(path)
+        if (context.definition_metadata or {}).get("lazy", False):
+            context.log.info(f"[single] scanned (lazy) ← {path}")
+            return pl.scan_parquet(path)
+
+        st = os.stat(path)
+        df = self._read_parquet_cached(path, st.st_mtime_ns, st.st_size)
         context.log.info(f"[single] loaded {len(df):,} rows ← {path}")
         return df
 
@@ -147,11 +367,24 @@ class PolarsParquetIOManager(IOManager, ConfigurableResource):
     config_schema={
         "base_dir": str,
         "mode": str,   # single | flat_chunk | hive_chunk
+        "row_group_size": Field(int, is_required=False, default_value=512_000),
+        "statistics": Field(bool, is_required=False, default_value=True),
+        "compression_level": Field(int, is_required=False, default_value=1),
+        "max_concurrent_writes": Field(int, is_required=False, default_value=4),
     }
 )
 def polars_parquet_io_manager(init_context):
     cfg = init_context.resource_config
-    return PolarsParquetIOManager(
+    mgr = PolarsParquetIOManager(
         base_dir=cfg["base_dir"],
         mode=cfg.get("mode", "single"),
+        row_group_size=cfg.get("row_group_size", 512_000),
+        statistics=cfg.get("statistics", True),
+        compression_level=cfg.get("compression_level", 1),
+        max_concurrent_writes=cfg.get("max_concurrent_writes", 4),
     )
+    try:
+        yield mgr
+    finally:
+        # resource teardown: drain background chunk writers
+        mgr.shutdown()
@@ -1,9 +1,15 @@
 # ---------------------------------------------------------------------------
 #  SocrataResource – v4
 # ---------------------------------------------------------------------------
+import io
+import json
+import threading
 import time
-from typing import Any, Dict, List, Tuple
+from collections import OrderedDict
+from typing import Any, ClassVar, Dict, Iterable, List, Mapping, Tuple
 
+import orjson
+import polars as pl
 import requests
 from requests.adapters import HTTPAdapter
 from requests.exceptions import ReadTimeout, ConnectionError
@@ -15,6 +21,34 @@ _TIMEOUT_S             = 90           # seconds to wait for one HTTP response
 _MAX_READ_RETRIES      = 3            # retries when we *raise* ReadTimeout/ConnErr
 _MAX_EMPTY_RETRIES     = 2            # extra retries when response body is empty
 _BACKOFF_FACTOR_S      = 1            # 1 s → 2 s → 4 s …
+_CACHE_MAX_ENTRIES     = 16           # LRU size for repeated (endpoint, params) requests
+_CACHE_MAX_ROWS        = 10_000       # larger payloads (bulk pages) are never cached
+_POOL_CONNECTIONS      = 16           # per-host connection pools kept by the adapter
+_POOL_MAXSIZE          = 32           # keep-alive connections per host pool
+
+
+def _features_to_columns(features: List[dict]) -> Dict[str, list]:
+    """
+    GeoJSON features → dict-of-lists over their `properties`, in one pass.
+    Keys missing from a feature (Socrata omits nulls) are padded with None.
+    """
+    cols: Dict[str, list] = {}
+    for n, f in enumerate(features, start=1):
+        for k, v in (f.get("properties") or {}).items():
+            col = cols.get(k)
+            if col is None:
+                col = cols[k] = [None] * (n - 1)
+            col.append(v)
+        for col in cols.values():
+            if len(col) < n:
+                col.append(None)
+    return cols
+
+def _has_nested(cols: Mapping[str, list], names: Iterable[str]) -> bool:
+    """True if any of the `names` columns holds a dict or list value."""
+    return any(
+        isinstance(v, (dict, list)) for k in names for v in cols.get(k, ())
+    )
 
 class SocrataResource(ConfigurableResource):
     """Reusable resource for hitting Socrata endpoints with robust retries."""
@@ -23,7 +57,8 @@ class SocrataResource(ConfigurableResource):
 
     # singletons shared across the Dagster process
     _session: requests.Session | None = None
-    _cache:   Tuple[str, Dict[str, Any], List[dict]] | None = None
+    _cache:   ClassVar["OrderedDict[Tuple[str, str], List[dict] | pl.DataFrame]"] = OrderedDict()
+    _cache_lock: ClassVar[threading.Lock] = threading.Lock()   # pages may be prefetched on threads
     _retry   = Retry(
         total=5,
         backoff_factor=_BACKOFF_FACTOR_S,
@@ -37,29 +72,34 @@ class SocrataResource(ConfigurableResource):
         if self._session is None:
             s = requests.Session()
             s.headers.update({"X-App-Token": self.api_token})
-            s.mount("http://",  HTTPAdapter(max_retries=self._retry))
-            s.mount("https://", HTTPAdapter(max_retries=self._retry))
+            adapter = HTTPAdapter(
+                pool_connections=_POOL_CONNECTIONS,
+                pool_maxsize=_POOL_MAXSIZE,
+                max_retries=self._retry,
+            )
+            s.mount("http://",  adapter)
+            s.mount("https://", adapter)
             self.__class__._session = s
         return self._session
 
     # ------------------------------------------------------------------ #
-    def fetch_data(
+    def _fetch_records(
         self,
         endpoint: str,
         query_params: Dict[str, Any],
-    ) -> List[dict]:
+    ) -> List[dict] | pl.DataFrame:
         """
-        GET <endpoint>?<query_params>  →  list-of-dict records
-        (geojson endpoints return .features[].properties)
+        GET <endpoint>?<query_params> with retries + LRU cache  →  raw records
+        (json: row dicts, geojson: feature dicts, csv: all-Utf8 DataFrame)
         """
 
-        # ── tiny one-item cache ──
-        if (
-            self._cache
-            and self._cache[0] == endpoint
-            and self._cache[1] == query_params
-        ):
-            return self._cache[2]
+        # ── small LRU keyed on endpoint + canonical params string ──
+        key = (endpoint, json.dumps(query_params, sort_keys=True, separators=(",", ":")))
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
 
         sess = self._get_session()
 
@@ -76,23 +116,99 @@ class SocrataResource(ConfigurableResource):
                 continue                          # retry the GET
 
             # ── got an HTTP 200 OK … make sure we actually received rows ──
-            if endpoint.endswith(".geojson"):
-                payload = [
-                    f.get("properties", {}) for f in resp.json().get("features", [])
-                ]
+            if endpoint.endswith(".csv"):
+                # Rust CSV reader, no inference: every column stays Utf8 (as in JSON)
+                payload = (
+                    pl.read_csv(io.BytesIO(resp.content), infer_schema_length=0)
+                    if resp.content.strip() else pl.DataFrame()
+                )
             else:
-                payload = resp.json()
+                # orjson parses the raw bytes in C (much faster than resp.json())
+                body = orjson.loads(resp.content)
+                if endpoint.endswith(".geojson"):
+                    payload = body.get("features", [])
+                else:
+                    payload = body
 
-            if payload or read_attempt > _MAX_EMPTY_RETRIES:
+            if len(payload) or read_attempt > _MAX_EMPTY_RETRIES:
                 break                             # success (or give up on empties)
             # Empty body when limit > 0 → very likely a silent timeout / truncation
             time.sleep(_BACKOFF_FACTOR_S * 2 ** (read_attempt - 1))
             continue                              # retry GET from same offset
 
-        # update cache
-        self.__class__._cache = (endpoint, query_params, payload)
+        # paged bulk fetches never repeat a key – caching them only pins memory
+        if len(payload) > _CACHE_MAX_ROWS:
+            return payload
+
+        # update cache (evict least-recently used beyond capacity)
+        with self._cache_lock:
+            self._cache[key] = payload
+            if len(self._cache) > _CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
         return payload
 
+    # ------------------------------------------------------------------ #
+    def fetch_data(
+        self,
+        endpoint: str,
+        query_params: Dict[str, Any],
+    ) -> List[dict]:
+        """
+        GET <endpoint>?<query_params>  →  list-of-dict records
+        (geojson endpoints return .features[].properties)
+        """
+        records = self._fetch_records(endpoint, query_params)
+        if endpoint.endswith(".geojson"):
+            return [f.get("properties", {}) for f in records]
+        if endpoint.endswith(".csv"):
+            return records.to_dicts()
+        return records
+
+    # ------------------------------------------------------------------ #
+    def fetch_frame(
+        self,
+        endpoint: str,
+        query_params: Dict[str, Any],
+        schema: Mapping[str, pl.DataType] | None = None,
+    ) -> pl.DataFrame:
+        """
+        GET <endpoint>?<query_params>  →  Polars DataFrame
+        (geojson .features[].properties are gathered column-wise, so no
+        per-row dict is materialized before Polars sees the data)
+
+        `schema` (typically the first page's) pins its String columns so they
+        skip inference; other dtypes are never pinned (an Int64 override would
+        truncate a later 1.5), and columns it lacks are still inferred, never
+        dropped. Scalars in a pinned column are stored as text (the String
+        supertype diagonal_relaxed would give them anyway); a page with nested
+        (dict/list) values there is inferred as a whole instead, and
+        pl.concat(how="diagonal_relaxed") reconciles it downstream. CSV
+        endpoints are parsed natively and skip inference altogether, so
+        `schema` does not apply to them.
+        """
+        records = self._fetch_records(endpoint, query_params)
+        if endpoint.endswith(".csv"):
+            return records
+
+        pinned = {k: dt for k, dt in (schema or {}).items() if dt == pl.String}
+        if endpoint.endswith(".geojson"):
+            cols = _features_to_columns(records)
+            if pinned:
+                schema = {k: pinned.get(k) for k in cols}
+                try:
+                    return pl.DataFrame(cols, schema=schema)
+                except TypeError:
+                    # non-text scalars: coerce them, as the JSON row path does
+                    if not _has_nested(cols, pinned):
+                        return pl.DataFrame(cols, schema=schema, strict=False)
+            return pl.DataFrame(cols)
+        if pinned:
+            try:
+                return pl.DataFrame(records, schema_overrides=pinned)
+            except (TypeError, pl.exceptions.ComputeError):
+                pass                              # nested values → plain inference
+        return pl.DataFrame(records)
+
     # ------------------------------------------------------------------ #
     def __del__(self):
         if self._session is not None:
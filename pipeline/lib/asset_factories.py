@@ -24,25 +24,28 @@ from __future__ import annotations
 
 import os
 import glob
-import copy
-from datetime import datetime, timedelta
-from typing import Callable, Dict, Optional, Mapping, Any, List, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional, Mapping, Any, List, Tuple
 
 import polars as pl
 from dagster import AssetKey, asset, MetadataValue
 
 from pipeline.constants import RAW_LAKE_PATH
-from pipeline.lib.polars_helpers import generic_transform, to_snake_case
+from pipeline.lib.polars_helpers import _snake, generic_transform
 
 
 # ───────────────────────────── helpers ─────────────────────────────
 
 def _portal_url(endpoint: str) -> str:
     if endpoint.endswith(".json"):
-        return endpoint[:-5]
-    if endpoint.endswith(".geojson"):
-        return endpoint[:-8]
-    return endpoint
+        return endpoint.removesuffix(".json")
+    return endpoint.removesuffix(".geojson")
+
+
+def _csv_endpoint(endpoint: str) -> str:
+    """Same Socrata resource served as CSV (…/abcd-1234.json → …/abcd-1234.csv)."""
+    return _portal_url(endpoint) + ".csv"
 
 
 def _default_tags(extra: Optional[dict[str, str]]) -> dict[str, str]:
@@ -68,6 +71,152 @@ def _extract_order_token(order_field: str) -> str:
     return token.strip("`\"")
 
 
+def _keep_cols(schema_cfg: Mapping[str, Any] | None, order_field: str | None) -> List[str] | None:
+    """
+    schema_cfg["keep_cols"] plus the raw order column, which `date_column` is
+    derived from – leaving it out would silently write an all-null date_column.
+    """
+    keep = list((schema_cfg or {}).get("keep_cols") or [])
+    if not keep:
+        return None
+    token = _extract_order_token(order_field) if order_field else None
+    if token and token not in keep:
+        keep.append(token)
+    return keep
+
+
+def _hive_dirs(root: str, key: str) -> List[Tuple[int, str]]:
+    """
+    Sorted `(value, path)` for the `<key>=<int>` sub-directories of `root`.
+    os.scandir reuses the dirent type, so no extra stat per entry.
+    """
+    if not os.path.isdir(root):
+        return []
+    prefix = f"{key}="
+    with os.scandir(root) as it:
+        found = [
+            (int(e.name[len(prefix):]), e.path)
+            for e in it
+            if e.name.startswith(prefix) and e.is_dir(follow_symlinks=False)
+        ]
+    return sorted(found)
+
+
+def _parquet_files(path: str) -> List[str]:
+    """Sorted *.parquet files directly inside `path`."""
+    with os.scandir(path) as it:
+        return sorted(e.path for e in it if e.name.endswith(".parquet") and e.is_file())
+
+
+def _scan_transformed(
+    files: List[str],
+    transform: Callable[[pl.LazyFrame], pl.LazyFrame],
+    keep_cols: List[str] | None = None,
+) -> pl.LazyFrame:
+    """
+    One lazy, transformed view over parquet chunks.
+
+    Chunks with identical footer schemas (the usual case) become a single
+    multi-file scan that is transformed once. Otherwise each chunk is
+    transformed first and the results are stacked vertically if they now
+    agree, or unioned by name (diagonal_relaxed) if not.
+
+    `keep_cols` (raw column names) is selected straight after the scan so the
+    reader skips the other column chunks. The medium/large builders take it
+    from schema_cfg["keep_cols"] via _keep_cols(), which always adds the raw
+    order_field column (date_column is derived from it).
+
+    Scans run with low_memory=True: less read-ahead buffering, traded for a
+    lower peak on large partitions.
+    """
+    schemas = [pl.read_parquet_schema(f) for f in files]
+
+    def _scan(src: str | List[str], schema: Mapping[str, Any]) -> pl.LazyFrame:
+        lf = pl.scan_parquet(src, low_memory=True, rechunk=False)
+        if keep_cols:
+            lf = lf.select([c for c in keep_cols if c in schema])
+        return transform(lf)
+
+    if all(sc == schemas[0] for sc in schemas[1:]):
+        return _scan(files, schemas[0])
+
+    # transforms often normalise dtypes, so the results may line up after all;
+    # a plain vertical concat then skips diagonal_relaxed's null-fill planning
+    chunk_lfs = [_scan(f, sc) for f, sc in zip(files, schemas)]
+    out_schemas = [lf.collect_schema() for lf in chunk_lfs]
+    same = all(sc == out_schemas[0] for sc in out_schemas[1:])
+    return pl.concat(chunk_lfs, how="vertical" if same else "diagonal_relaxed")
+
+
+def _iter_pages(
+    fetch: Callable[..., pl.DataFrame],
+    endpoint: str,
+    query: Mapping[str, Any],
+    *,
+    limit: int,
+) -> Iterator[pl.DataFrame]:
+    """
+    Yield successive non-empty offset pages of `endpoint`. The next page is
+    requested on a background thread as soon as a full page arrives, so it
+    downloads while the caller transforms/writes the current one; a page
+    shorter than `limit` is the last one, so nothing is requested past it
+    (only a total that is an exact multiple of `limit` costs one empty page).
+    Once a page has arrived its schema is passed to `fetch` so later pages
+    skip dtype inference.
+    `query` entries are applied after $limit/$offset (same precedence as before).
+    """
+    offset = 0
+    ref_schema: pl.Schema | None = None
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+
+        def _submit() -> Future:
+            nonlocal offset
+            params = {"$limit": limit, "$offset": offset, **query}
+            offset += limit
+            return pool.submit(fetch, endpoint, params, schema=ref_schema)
+
+        pending: Future | None = _submit()
+        try:
+            while pending is not None:
+                df = pending.result()
+                pending = None
+                if df.is_empty():
+                    break
+                if ref_schema is None:
+                    # all-null columns carry no dtype information – keep inferring them
+                    ref_schema = pl.Schema(
+                        {k: dt for k, dt in df.schema.items() if dt != pl.Null}
+                    )
+                if df.height >= limit:
+                    pending = _submit()       # full page → there may be more
+                yield df
+        finally:
+            # caller stopped early – drop the prefetch if it has not started
+            if pending is not None:
+                pending.cancel()
+
+
+def _coalesce_pages(pages: Iterator[pl.DataFrame], rows: int) -> Iterator[pl.DataFrame]:
+    """
+    Regroup fetched pages into chunks of at least `rows` rows (the last one may
+    be short), so the HTTP page size and the on-disk chunk size tune separately.
+    """
+    buf: List[pl.DataFrame] = []
+    height = 0
+    for df in pages:
+        if not buf and df.height >= rows:
+            yield df                      # common case: page already chunk-sized
+            continue
+        buf.append(df)
+        height += df.height
+        if height >= rows:
+            yield pl.concat(buf, how="diagonal_relaxed")
+            buf, height = [], 0
+    if buf:
+        yield pl.concat(buf, how="diagonal_relaxed")
+
+
 # ──────────────────────── auto-transform wrapper ────────────────────────
 
 def _auto_transform(
@@ -84,38 +233,37 @@ def _auto_transform(
       • promotes `date_column` to first place
     """
     raw_token   = _extract_order_token(order_field)
-    token_snake = to_snake_case(pl.DataFrame({raw_token: []})).columns[0]
+    token_snake = _snake(raw_token)
     rename_map  = schema_cfg.get("rename_map", {}) or {}
     final_field = rename_map.get(token_snake, token_snake)
 
     # ensure the ordering field is treated as a date
-    cfg = copy.deepcopy(schema_cfg)
-    date_cols = list(cfg.get("date_cols", []))  # allow mutation even if tuple
-    if raw_token in date_cols:
+    # only date_cols is modified, so a shallow copy with a fresh list is enough
+    date_cols = list(schema_cfg.get("date_cols", []))
+    date_cols_set = set(date_cols)
+    if raw_token in date_cols_set and raw_token != final_field:
         date_cols = [final_field if c == raw_token else c for c in date_cols]
-    elif final_field not in date_cols:
+    elif final_field not in date_cols_set:
         date_cols.append(final_field)
-    cfg["date_cols"] = date_cols
+    cfg = {**schema_cfg, "date_cols": date_cols}
 
     def _wrapped(lf: pl.LazyFrame) -> pl.LazyFrame:
         lf2 = generic_transform(lf, cfg, custom=custom_fn)
 
+        # resolve the schema once
+        names_set = set(lf2.collect_schema().names())
+
         # safeguard: if the final_field never appeared (e.g., all-null), inject as null datetime
-        cols_after = lf2.collect_schema().names()
-        if final_field not in cols_after:
-            lf2 = lf2.with_columns(
-                pl.lit(None).cast(pl.Datetime).alias(final_field)
-            )
+        date_src = pl.col(final_field)
+        injected: list[pl.Expr] = []
+        if final_field not in names_set:
+            date_src = pl.lit(None).cast(pl.Datetime)
+            if final_field != "date_column":      # the head below already adds that one
+                injected.append(date_src.alias(final_field))
 
-        # now add or reorder date_column
-        cols = lf2.collect_schema().names()
-        if final_field in cols:
-            if "date_column" not in cols:
-                lf2 = lf2.with_columns(pl.col(final_field).alias("date_column"))
-                cols.insert(0, "date_column")
-            else:
-                cols = ["date_column"] + [c for c in cols if c != "date_column"]
-            lf2 = lf2.select(cols)
+        # add or promote date_column – one projection: date_column, the rest, injected field
+        head = pl.col("date_column") if "date_column" in names_set else date_src.alias("date_column")
+        lf2 = lf2.select(head, pl.exclude("date_column"), *injected)
 
         return lf2
 
@@ -153,6 +301,7 @@ def build_single_socrata_asset(
     where_clause: str | None = None,
     additional_params: dict[str, str] | None = None,
     limit: int = 500_000,
+    use_csv: bool = False,
     tags: Optional[dict[str, str]] = None,
     description_raw: str = "Raw dataframe – single parquet.",
     description_clean: str = "Cleaned dataframe – single parquet.",
@@ -160,6 +309,8 @@ def build_single_socrata_asset(
     raw_key    = f"{asset_name}_raw"
     asset_tags = _default_tags(tags)
     meta       = _meta(endpoint)
+    # CSV pages parse in Polars' native reader instead of JSON → Python dicts
+    fetch_endpoint = _csv_endpoint(endpoint) if use_csv else endpoint
 
     # RAW --------------------------------------------------------------------
     @asset(
@@ -178,8 +329,7 @@ def build_single_socrata_asset(
         if additional_params:
             params.update(additional_params)
 
-        recs = context.resources.socrata.fetch_data(endpoint, params)
-        df   = pl.DataFrame(recs)
+        df = context.resources.socrata.fetch_frame(fetch_endpoint, params)
         context.log.info(f"[{raw_key}] downloaded {df.height:,} rows")
         context.add_output_metadata({"row_count": df.height})
         return df
@@ -228,6 +378,8 @@ def build_medium_socrata_asset(
     where_clause: str | None = None,
     additional_params: dict[str, str] | None = None,
     limit: int = 500_000,
+    page_size: int | None = None,
+    use_csv: bool = False,
     tags: Optional[dict[str, str]] = None,
     description_raw: str = "Unprocessed chunked parquet files (medium).",
     description_clean: str = "Consolidated & transformed single parquet (medium).",
@@ -235,12 +387,15 @@ def build_medium_socrata_asset(
     raw_key    = f"{asset_name}_raw"
     asset_tags = _default_tags(tags)
     meta       = _meta(endpoint)
+    # CSV pages parse in Polars' native reader instead of JSON → Python dicts
+    fetch_endpoint = _csv_endpoint(endpoint) if use_csv else endpoint
     _transform = _resolve_transform(
         transform_fn=transform_fn,
         schema_cfg =schema_cfg,
         custom_fn  =custom_fn,
         order_field=order_field,
     )
+    keep_cols  = _keep_cols(schema_cfg, order_field)
 
     # RAW --------------------------------------------------------------------
     @asset(
@@ -252,21 +407,22 @@ def build_medium_socrata_asset(
         metadata               = meta,
     )
     def raw_asset(context) -> str:
-        mgr    = context.resources.raw_medium_io_manager
-        offset = batch = total = 0
-        while True:
-            query: Dict[str, Any] = {"$limit": limit, "$offset": offset, "$order": order_field}
-            if where_clause:      query["$where"] = where_clause
-            if additional_params: query.update(additional_params)
-
-            recs = context.resources.socrata.fetch_data(endpoint, query)
-            if not recs:
-                break
-            df = pl.DataFrame(recs)
+        mgr   = context.resources.raw_medium_io_manager
+        batch = total = 0
+        query: Dict[str, Any] = {"$order": order_field}
+        if where_clause:      query["$where"] = where_clause
+        if additional_params: query.update(additional_params)
+
+        # next page is already downloading while this one is written
+        # `limit` rows per chunk on disk; `page_size` rows per HTTP request
+        pages = _iter_pages(
+            context.resources.socrata.fetch_frame, fetch_endpoint, query,
+            limit=page_size or limit,
+        )
+        for df in _coalesce_pages(pages, limit):
             batch += 1
             total += df.height
             mgr.write_chunk(raw_key, batch, df)   # *_raw* folder
-            offset += limit
         return f"{total:,} rows"
 
     # CLEAN ------------------------------------------------------------------
@@ -285,9 +441,8 @@ def build_medium_socrata_asset(
         if not files:
             return "skip"
 
-        # Option A: transform each chunk FIRST, then relaxed *union-by-name* concat
-        chunk_lfs = [_transform(pl.scan_parquet(f)) for f in files]
-        merged_lf = pl.concat(chunk_lfs, how="diagonal_relaxed")
+        # one multi-file scan when chunk schemas agree, else union-by-name concat
+        merged_lf = _scan_transformed(files, _transform, keep_cols)
 
         # Streamed write via IO manager (no big collect)
         context.resources.clean_medium_io_manager.write_single(asset_name, merged_lf)
@@ -315,6 +470,9 @@ def build_large_socrata_asset(
     partition_granularity: str = "month",   # 'month' or 'year'
     additional_params: dict[str, str] | None = None,
     limit: int = 500_000,
+    page_size: int | None = None,
+    use_csv: bool = False,
+    max_parallel_windows: int = 4,
     tags: Optional[dict[str, str]] = None,
     description_raw: str = "Unprocessed chunked parquet files (partitioned monthly).",
     description_clean: str = "Partitioned parquet w/ transformations (large).",
@@ -323,8 +481,10 @@ def build_large_socrata_asset(
         raise ValueError("partition_granularity must be 'month' or 'year'")
 
     raw_key = f"{asset_name}_raw"
-    asset_tags = {"source": "socrata", "type": "ingestion", **(tags or {})}
-    meta = {"nyc_portal_url": MetadataValue.url(endpoint.rstrip(".geojson").rstrip(".json"))}
+    asset_tags = _default_tags(tags)
+    meta = _meta(endpoint)
+    # CSV pages parse in Polars' native reader instead of JSON → Python dicts
+    fetch_endpoint = _csv_endpoint(endpoint) if use_csv else endpoint
 
     _transform = _resolve_transform(
         transform_fn=transform_fn,
@@ -332,15 +492,15 @@ def build_large_socrata_asset(
         custom_fn=custom_fn,
         order_field=order_field,
     )
+    keep_cols = _keep_cols(schema_cfg, order_field)
 
-    def _monthly_windows() -> List[Tuple[datetime, datetime]]:
-        cur = start_date.replace(day=1)
-        windows: List[Tuple[datetime, datetime]] = []
-        while cur < end_date:
-            nxt = (cur + timedelta(days=32)).replace(day=1)
-            windows.append((cur, nxt))
-            cur = nxt
-        return windows
+    # [month start, next month start) windows, built once per factory call
+    starts = pl.datetime_range(
+        start_date.replace(day=1), end_date, interval="1mo", closed="left", eager=True
+    )
+    monthly_windows: List[Tuple[datetime, datetime]] = list(
+        zip(starts.to_list(), starts.dt.offset_by("1mo").to_list())
+    )
 
     # ───────────────────────────── RAW (always monthly) ───────────────────────────── #
     @asset(
@@ -353,37 +513,58 @@ def build_large_socrata_asset(
     )
     def raw_asset(context) -> str:
         mgr = context.resources.raw_large_io_manager
-        chunks = 0
         raw_token = _extract_order_token(order_field)
 
-        for win_start, win_end in _monthly_windows():
-            offset = batch = 0
+        def _fetch_window(win_start: datetime, win_end: datetime) -> int:
+            """Page one monthly window into its partition; returns chunks written."""
+            batch = 0
             where = (
                 f"{raw_token} >= '{win_start:%Y-%m-%dT00:00:00}' AND "
                 f"{raw_token} < '{win_end:%Y-%m-%dT00:00:00}'"
             )
-            while True:
-                query = {"$limit": limit, "$offset": offset, "$order": order_field, "$where": where}
-                if additional_params:
-                    query.update(additional_params)
-
-                recs = context.resources.socrata.fetch_data(endpoint, query)
-                if not recs:
-                    break
-
-                df = pl.DataFrame(recs)
+            query = {"$order": order_field, "$where": where}
+            if additional_params:
+                query.update(additional_params)
+
+            # next page is already downloading while this one is written
+            # `limit` rows per chunk on disk; `page_size` rows per HTTP request
+            pages = _iter_pages(
+                context.resources.socrata.fetch_frame, fetch_endpoint, query,
+                limit=page_size or limit,
+            )
+            for df in _coalesce_pages(pages, limit):
                 batch += 1
-                chunks += 1
 
-                mgr.write_chunk(
+                # parquet encode runs on the IO manager's writer pool while we fetch on
+                mgr.submit_chunk(
                     raw_key,
                     batch,
                     df,
                     year=win_start.year,
                     month=win_start.month,
                 )
-                offset += limit
+            return batch
 
+        # windows are independent partitions → page several months at once
+        chunks = 0
+        pool = ThreadPoolExecutor(max_workers=max(1, max_parallel_windows))
+        try:
+            futures = [pool.submit(_fetch_window, *win) for win in monthly_windows]
+            for fut in as_completed(futures):
+                chunks += fut.result()
+        except BaseException:
+            # fail fast: drop the queued windows instead of fetching them all
+            # before the error surfaces, and don't leave chunk writes pending
+            pool.shutdown(wait=True, cancel_futures=True)
+            try:
+                mgr.wait_for_writes()
+            except Exception:
+                pass                      # the window error is the one to report
+            raise
+        finally:
+            pool.shutdown(wait=True)
+
+        mgr.wait_for_writes()
         return f"{chunks} chunks"
 
     # ───────────────────────────── CLEAN (yearly OR monthly) ───────────────────────── #
@@ -402,47 +583,43 @@ def build_large_socrata_asset(
         processed = 0
 
         # Iterate by year directory
-        for y_path in sorted(glob.glob(os.path.join(raw_root, "year=*"))):
-            yr = int(os.path.basename(y_path).split("=", 1)[1])
+        for yr, y_path in _hive_dirs(raw_root, "year"):
 
             if partition_granularity == "month":
                 # Process each month separately → monthly clean partitions
-                month_dirs = sorted(glob.glob(os.path.join(y_path, "month=*")))
-                for m_path in month_dirs:
-                    mo = int(os.path.basename(m_path).split("=", 1)[1])
-                    files = sorted(glob.glob(os.path.join(m_path, "*.parquet")))
+                for mo, m_path in _hive_dirs(y_path, "month"):
+                    files = _parquet_files(m_path)
                     if not files:
                         continue
 
-                    # Option A: transform each file first, then relaxed union-by-name concat
-                    chunk_lfs = [_transform(pl.scan_parquet(f)) for f in files]
-                    merged    = pl.concat(chunk_lfs, how="diagonal_relaxed")
-                    clean_df  = merged.collect()
+                    # one multi-file scan when chunk schemas agree, else union-by-name concat
+                    merged = _scan_transformed(files, _transform, keep_cols)
 
-                    mgr.write_chunk(
+                    # Streamed write via IO manager (sink_parquet, no big collect)
+                    mgr.write_chunk_lazy(
                         asset_name,
                         1,
-                        clean_df,
+                        merged,
                         year=yr,
                         month=mo,
                     )
                     processed += 1
 
             else:  # yearly clean
-                files = sorted(glob.glob(os.path.join(y_path, "**", "*.parquet"), recursive=True))
+                files = _parquet_files(y_path)
+                for _, m_path in _hive_dirs(y_path, "month"):
+                    files.extend(_parquet_files(m_path))
                 if not files:
                     continue
 
-                # Option A: transform each file first, then relaxed union-by-name concat
-                chunk_lfs = [_transform(pl.scan_parquet(f)) for f in files]
-                merged    = pl.concat(chunk_lfs, how="diagonal_relaxed")
-                clean_df  = merged.collect()
+                # one multi-file scan when chunk schemas agree, else union-by-name concat
+                merged = _scan_transformed(files, _transform, keep_cols)
 
-                # One yearly partition (month=None)
-                mgr.write_chunk(
+                # One yearly partition (month=None), streamed via sink_parquet
+                mgr.write_chunk_lazy(
                     asset_name,
                     1,
-                    clean_df,
+                    merged,
                     year=yr,
                     month=None,
                 )
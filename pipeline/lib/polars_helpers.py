@@ -5,6 +5,10 @@ import polars as pl
 import re
 from typing import Mapping, Callable, Any
 
+# Precompiled once: to_snake_case runs several times per asset build
+_SNAKE_RE = re.compile(r"[^0-9a-z_]+")
+_SPACE_HYPHEN_TRANS = str.maketrans({" ": "_", "-": "_"})
+
 
 # ----------------- basic helpers -----------------
 
@@ -13,6 +17,11 @@ def _colnames(df: pl.DataFrame | pl.LazyFrame) -> list[str]:
     return df.collect_schema().names() if isinstance(df, pl.LazyFrame) else list(df.columns)
 
 
+def _snake(name: str) -> str:
+    """snake_case a single column name (same rules as to_snake_case)."""
+    return _SNAKE_RE.sub("", name.lower().translate(_SPACE_HYPHEN_TRANS))
+
+
 def to_snake_case(df: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
     """
     Convert all column names to snake_case:
@@ -20,10 +29,10 @@ def to_snake_case(df: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame | pl.LazyFram
       • Replace spaces and hyphens with underscores
       • Strip invalid characters
     """
-    mapping = {
-        c: re.sub(r"[^0-9a-z_]+", "", c.lower().replace(" ", "_").replace("-", "_"))
-        for c in _colnames(df)
-    }
+    # only rename what actually changes; already-clean inputs pass through untouched
+    mapping = {c: s for c in _colnames(df) if (s := _snake(c)) != c}
+    if not mapping:
+        return df
     return df.rename(mapping)
 
 
@@ -48,19 +57,27 @@ def generic_transform(
     # Always work in LazyFrame
     lf = df.lazy() if isinstance(df, pl.DataFrame) else df
 
-    # Snake case renaming
-    lf = to_snake_case(lf)
-
-    # Column renames from config
+    # Snake case + config renames (schema_cfg["rename_map"], keyed by snake_case
+    # names) composed into one mapping → a single rename node
     rename_map: dict[str, str] = schema_cfg.get("rename_map", {}) or {}
-    if rename_map:
-        lf = lf.rename(rename_map)
+    final_names: dict[str, str] = {}
+    for c in lf.collect_schema().names():
+        snake = _snake(c)
+        final_names[c] = rename_map.get(snake, snake)
+    mapping = {c: f for c, f in final_names.items() if c != f}
+    if mapping:
+        lf = lf.rename(mapping)
+    schema_names = set(final_names.values())
 
     # Dtype overrides
     dtype_overrides: dict[str, Any] = schema_cfg.get("dtype_overrides", {}) or {}
-    for col, dtype in dtype_overrides.items():
-        if col in lf.collect_schema().names():
-            lf = lf.with_columns(pl.col(col).cast(dtype, strict=False))
+    casts = [
+        pl.col(col).cast(dtype, strict=False)
+        for col, dtype in dtype_overrides.items()
+        if col in schema_names
+    ]
+    if casts:
+        lf = lf.with_columns(casts)
 
     # Custom user-supplied function
     if custom:
@@ -1,17 +1,20 @@
 # /// script
 # requires-python = ">=3.10"
-# dependencies = ["beautifulsoup4", "requests"]
+# dependencies = ["orjson", "requests", "selectolax"]
 # ///
 
 from __future__ import annotations
 
-import argparse, csv, json, logging, random, re, sys
+import argparse, csv, hashlib, html, json, logging, os, random, re, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 from urllib.parse import urlparse
 
+import orjson
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,6 +26,8 @@ log = logging.getLogger(__name__)
 DATASET_ID_RE = re.compile(r"/([A-Za-z0-9]{4}-[A-Za-z0-9]{4})(?:[/?]|$)")
 ROWS_RE       = re.compile(r"([\d,.]+)\s*([KkMm]?)")
 
+_cached_urlparse = lru_cache(maxsize=1024)(urlparse)   # rows/args often repeat URLs
+
 BOOL_HINTS = ("flag", "indicator", "boolean", "bool", "is_", "has_")
 INT_HINTS  = (
     "id", "code", "num", "number", "count", "total", "units", "year",
@@ -30,7 +35,33 @@ INT_HINTS  = (
 )
 FLOAT_HINTS = ("ratio", "percent", "rate", "far", "latitude", "longitude", "coord")
 
+# all hint families in one pattern; branches are tried in priority order
+# (bool → int → float) and the empty named group that matches names the bucket
+_NUM_RE = re.compile("|".join(
+    rf"(?=.*(?:{'|'.join(map(re.escape, hints))}))(?P<{bucket}>)"
+    for bucket, hints in (
+        ("bool_cols", BOOL_HINTS), ("int_cols", INT_HINTS), ("float_cols", FLOAT_HINTS),
+    )
+), re.DOTALL)
+
 SIZE_LIMIT = {"single": 500_000, "medium": 20_000_000}    # >20 M → large
+MAX_WORKERS = 16                                          # assets scraped concurrently
+
+# on-disk GET cache (re-runs stay offline); next to this script, not the CWD.
+# --cache-dir / --refresh / --no-cache override these in main()
+CACHE_DIR   = Path(__file__).resolve().parent / ".cache" / "superscrape"
+CACHE_TTL_S = 24 * 60 * 60
+CACHE_READ  = True                                        # False → ignore cached responses
+CACHE_WRITE = True                                        # False → don't store responses
+
+# one keep-alive session for every request (skips a TCP+TLS handshake per call)
+SESSION = requests.Session()
+SESSION.headers["User-Agent"] = "easy-nyc-ingest-superscrape"
+SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+# per-request pool (separate from the per-asset pool in main, so it cannot starve);
+# bounded to the session's connection pool size
+FETCH_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="fetch")
 
 USAGE_TEXT = """
 Usage:
@@ -50,7 +81,18 @@ Default output directory (when not provided): scraped_outputs
 
 # ─────────────────────────── helpers ──────────────────────────────────────
 def _strip_html(text: str | None) -> str:
-    return BeautifulSoup(text or "", "html.parser").get_text(" ", strip=True)
+    if not text:
+        return ""
+    # most descriptions are plain text – no parser (and no parser import) needed;
+    # like get_text(" ", strip=True) on one text node: trim, keep inner newlines
+    if "<" not in text:
+        if "&" in text:
+            text = html.unescape(text)
+        return text.strip()
+    # selectolax (Lexbor, C) extracts tag-wrapped snippets without a Python-level tree;
+    # imported here so runs without any tagged description never load it
+    from selectolax.parser import HTMLParser
+    return " ".join(HTMLParser(text).text(separator=" ").split())
 
 def _dataset_id(url: str) -> str | None:
     m = DATASET_ID_RE.search(url)
@@ -65,17 +107,59 @@ def _views_meta_url(host: str, dsid: str) -> str:
 def _views_meta_v1_url(host: str, dsid: str) -> str:
     return f"https://{host}/api/views/metadata/v1/{dsid}"
 
+def _write_file(path: Path, data: bytes) -> None:
+    """One buffered binary write (no text-layer encode/newline pass)."""
+    with open(path, "wb", buffering=1 << 20) as fh:
+        fh.write(data)
+
+def _cache_file(url: str) -> Path:
+    return CACHE_DIR / hashlib.sha256(url.encode()).hexdigest()
+
+def _cache_get(url: str) -> str | None:
+    if not CACHE_READ:
+        return None
+    path = _cache_file(url)
+    try:
+        if time.time() - path.stat().st_mtime < CACHE_TTL_S:
+            return path.read_text(encoding="utf-8")
+    except OSError:
+        pass
+    return None
+
+def _cache_put(url: str, text: str) -> None:
+    if not CACHE_WRITE:
+        return
+    path = _cache_file(url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    _write_file(tmp, text.encode("utf-8"))
+    os.replace(tmp, path)                         # atomic: concurrent readers never see half a file
+
 def _get_json(url: str, *, timeout: int = 30) -> dict:
+    cached = _cache_get(url)
+    if cached is not None:
+        log.debug("↺ %s (cached)", url)
+        return json.loads(cached)
     log.debug("→ %s", url)
-    r = requests.get(url, timeout=timeout)
+    r = SESSION.get(url, timeout=timeout)
     r.raise_for_status()
+    _cache_put(url, r.text)
     return r.json()
 
+@lru_cache(maxsize=2048)
+def _get_json_cached(url: str, *, timeout: int = 30) -> dict:
+    """_get_json memoized for the run (duplicate rows/datasets hit the network once)."""
+    return _get_json(url, timeout=timeout)
+
 def _get_html(url: str) -> str | None:
+    cached = _cache_get(url)
+    if cached is not None:
+        return cached
     try:
         log.debug("→ %s (html)", url)
-        r = requests.get(url, timeout=30)
+        r = SESSION.get(url, timeout=30)
         r.raise_for_status()
+        _cache_put(url, r.text)
         return r.text
     except Exception as exc:                      # noqa: BLE001
         log.debug("html fetch failed: %s", exc)
@@ -95,15 +179,16 @@ def _parse_rows_token(token: str) -> int | None:
 
 def _looks_like_url(s: str) -> bool:
     try:
-        u = urlparse(s)
+        u = _cached_urlparse(s)
         return u.scheme in {"http", "https"} and bool(u.netloc)
     except Exception:
         return False
 
 # ────────── fast row-count helpers ────────────────────────────────────────
+@lru_cache(maxsize=4096)
 def _rows_from_header(endpoint: str) -> int | None:
     try:
-        r = requests.head(endpoint, timeout=10)
+        r = SESSION.head(endpoint, timeout=10)
         r.raise_for_status()
         for k, v in r.headers.items():
             if "row-count" in k.lower():
@@ -112,9 +197,10 @@ def _rows_from_header(endpoint: str) -> int | None:
         pass
     return None
 
+@lru_cache(maxsize=4096)
 def _rows_from_meta_v1(host: str, dsid: str) -> int | None:
     try:
-        data = _get_json(_views_meta_v1_url(host, dsid), timeout=20)
+        data = _get_json_cached(_views_meta_v1_url(host, dsid), timeout=20)
         val = data.get("rowCount") or data.get("rows")
         return int(val) if val is not None else None
     except Exception:
@@ -132,10 +218,11 @@ def _rows_from_meta_v2(meta: dict) -> int | None:
             best = max(best, int(val))
     return best or None
 
+@lru_cache(maxsize=4096)
 def _rows_from_catalog(host: str, dsid: str) -> int | None:
     try:
         url = f"https://{host}/api/catalog/v1?ids={dsid}&limit=1"
-        res = (_get_json(url, timeout=20).get("results") or [])[0]
+        res = (_get_json_cached(url, timeout=20).get("results") or [])[0]
         rows = res.get("resource", {}).get("rows") or res.get("resource", {}).get("row_count")
         return int(rows) if rows else None
     except Exception:
@@ -145,7 +232,7 @@ def _rows_from_count_query(endpoint: str) -> int | None:
     try:
         url = f"{endpoint}?$query=SELECT%20count(*)"
         log.info("⚠️  issuing count(*) query: %s", url)
-        r = requests.get(url, timeout=60)
+        r = SESSION.get(url, timeout=60)
         r.raise_for_status()
         data = r.json()
         raw = (data[0].get("count") if isinstance(data, list) and data else None)
@@ -155,21 +242,19 @@ def _rows_from_count_query(endpoint: str) -> int | None:
 
 # ────────── heuristics for number-typed columns ───────────────────────────
 def _classify_number(field: str, desc: str) -> str:
-    name = field.lower()
-    text = desc.lower()
-    if any(k in name for k in BOOL_HINTS) or "boolean" in text:
+    m = _NUM_RE.match(field.lower())
+    if m and m.lastgroup == "bool_cols":
+        return "bool_cols"
+    if "boolean" in desc.lower():
         return "bool_cols"
-    if any(k in name for k in INT_HINTS):
-        return "int_cols"
-    if any(k in name for k in FLOAT_HINTS):
-        return "float_cols"
-    return "float_cols"
+    return m.lastgroup if m else "float_cols"
 
 # ────────── build data-dictionary + buckets ───────────────────────────────
 def _bucket_columns(cols: List[dict]) -> Tuple[List[dict], Dict[str, List[str]]]:
     dd: List[dict] = []
-    buckets: Dict[str, List[str]] = {
-        "date_cols": [], "int_cols": [], "float_cols": [], "bool_cols": []
+    # sets while collecting (dedup for free), sorted once on the way out
+    buckets: Dict[str, set[str]] = {
+        "date_cols": set(), "int_cols": set(), "float_cols": set(), "bool_cols": set()
     }
 
     for c in cols:
@@ -181,11 +266,11 @@ def _bucket_columns(cols: List[dict]) -> Tuple[List[dict], Dict[str, List[str]]]
         desc = _strip_html(c.get("description") or "")
 
         if dt in ("calendar_date", "floating_timestamp", "fixed_timestamp"):
-            buckets["date_cols"].append(field)
+            buckets["date_cols"].add(field)
         elif dt == "number":
-            buckets[_classify_number(field, desc)].append(field)
+            buckets[_classify_number(field, desc)].add(field)
         elif dt == "checkbox":
-            buckets["bool_cols"].append(field)
+            buckets["bool_cols"].add(field)
 
         dd.append({
             "column_name":    c.get("name"),
@@ -194,9 +279,7 @@ def _bucket_columns(cols: List[dict]) -> Tuple[List[dict], Dict[str, List[str]]]
             "data_type":      dt,
         })
 
-    for k in buckets:
-        buckets[k] = sorted(set(buckets[k]))
-    return dd, buckets
+    return dd, {k: sorted(v) for k, v in buckets.items()}
 
 # ────────── misc helpers ──────────────────────────────────────────────────
 def _asset_size(row_count: int | None) -> str:
@@ -211,6 +294,46 @@ def _asset_size(row_count: int | None) -> str:
 def _slug(text: str) -> str:
     return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
 
+# ────────── .py stub template (formatted once per asset) ──────────────────
+_STUB_IMPORTS = {
+    "single": "from pipeline.lib.asset_factories import build_single_socrata_asset",
+    "medium": "from pipeline.lib.assets.asset_factories import build_medium_socrata_asset",
+    "large":  "from datetime import datetime\n"
+              "from pipeline.lib.asset_factories import build_large_socrata_asset",
+}
+_STUB_EXTRA = {
+    "single": "",
+    "medium": "",
+    "large": (
+        "    # TODO: adjust date window\n"
+        "    start_date = datetime(2020, 1, 1),\n"
+        "    end_date   = datetime(2025, 1, 1),\n"
+    ),
+}
+_STUB_TPL = """\
+{imports}
+
+from typing import Dict, Any
+
+TAG_AUTO = {{"domain": "auto", "source": "{host}"}}
+
+{rename_var}: Dict[str, str] = {{}}
+
+{cfg_var}: Dict[str, Any] = dict(
+    rename_map = {rename_var},
+    date_cols  = {date_cols},
+    int_cols   = {int_cols},
+    float_cols = {float_cols},
+    bool_cols  = {bool_cols},
+)
+
+{asset}_raw, {asset} = {builder_fn}(
+    asset_name = "{asset}",
+    endpoint   = "{endpoint}",
+    schema_cfg = {cfg_var},
+{extra}    tags = TAG_AUTO,
+)"""
+
 # ────────── CLI parsing with positional support ───────────────────────────
 def parse_args(argv: List[str]):
     """
@@ -229,6 +352,10 @@ def parse_args(argv: List[str]):
     # optional positionals
     p.add_argument("arg1", nargs="?", help="CSV path OR asset_name")
     p.add_argument("arg2", nargs="?", help="Output dir (CSV mode) OR URL (single-asset mode)")
+    p.add_argument("--fetch-html", action="store_true", help="Also download each dataset's landing page")
+    p.add_argument("--cache-dir", help=f"HTTP response cache directory (default: {CACHE_DIR})")
+    p.add_argument("--refresh", action="store_true", help="Ignore cached responses and re-download them")
+    p.add_argument("--no-cache", action="store_true", help="Neither read nor write the response cache")
     return p.parse_args(argv)
 
 def resolve_mode(args) -> tuple[str, dict]:
@@ -268,132 +395,113 @@ def resolve_mode(args) -> tuple[str, dict]:
     # If we got here, insufficient args
     raise SystemExit(USAGE_TEXT)
 
+# ────────── per-asset worker ──────────────────────────────────────────────
+def process_row(row: Dict[str, str], out_dir: Path, *, fetch_html: bool = False) -> None:
+    """Fetch metadata for one CSV row and write its JSON payload + .py stub."""
+    asset, orig_url = row["asset_name"].strip(), row["url"].strip()
+    if not asset or not orig_url:
+        log.error("Skipping row with missing asset_name or url: %s", row)
+        return
+
+    dsid = _dataset_id(orig_url)
+    if not dsid:
+        log.error("⚠️  cannot extract dataset id from %s", orig_url)
+        return
+
+    host     = _cached_urlparse(orig_url).netloc.lower()
+    endpoint = _canonical(host, dsid)
+
+    # the independent first-round requests go out together
+    meta_f   = FETCH_POOL.submit(_get_json_cached, _views_meta_url(host, dsid))
+    header_f = FETCH_POOL.submit(_rows_from_header, endpoint)
+    if fetch_html:  # landing page is not used yet – only fetched (and cached) on request
+        FETCH_POOL.submit(_get_html, f"https://{host}/d/{dsid}").result()
+    meta     = meta_f.result()
+
+    # fallbacks stay sequential and stop at the first hit
+    rows = (
+        header_f.result()
+        or _rows_from_meta_v1(host, dsid)
+        or _rows_from_meta_v2(meta)
+        or _rows_from_catalog(host, dsid)
+        or _rows_from_count_query(endpoint)
+    )
+    if rows is None:
+        log.warning("⚠️  could not determine row count for %s", dsid)
+
+    size, (cols, buckets) = _asset_size(rows), _bucket_columns(meta.get("columns", []) or [])
+    order_field = f"{random.choice(buckets['date_cols'])} ASC" if buckets['date_cols'] else ""
+
+    # ── write JSON payload ─────────────────────────────────────────
+    payload = {
+        "title":            meta.get("name"),
+        "description":      _strip_html(meta.get("description")),
+        "update_frequency": meta.get("metadata", {}).get("updateFrequency"),
+        "endpoint":         endpoint[:-5],  # strip .json
+        "data_dictionary":  cols,
+        "total_columns":    len(cols),
+        "rows":             rows,
+    }
+    _write_file(
+        out_dir / "json" / f"{_slug(payload['title'] or asset)}.json",
+        orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS),
+    )
+
+    # ── generate stub .py asset file ───────────────────────────────
+    order_line = f'    order_field = "{order_field}",\n' if order_field else ""
+    stub = _STUB_TPL.format(
+        imports    = _STUB_IMPORTS[size],
+        host       = host,
+        rename_var = f"{asset}_rename_map",
+        cfg_var    = f"{asset}_schema_cfg",
+        date_cols  = buckets["date_cols"],
+        int_cols   = buckets["int_cols"],
+        float_cols = buckets["float_cols"],
+        bool_cols  = buckets["bool_cols"],
+        asset      = asset,
+        builder_fn = f"build_{size}_socrata_asset",
+        endpoint   = endpoint,
+        extra      = order_line + _STUB_EXTRA[size],
+    )
+    _write_file(out_dir / "py" / f"{asset}.py", stub.encode("utf-8"))
+    log.info("✅  generated asset '%s' (size=%s, rows=%s)", asset, size, rows)
+
 # ─────────────────────────────── main ─────────────────────────────────────
 def main() -> None:
+    global CACHE_DIR, CACHE_READ, CACHE_WRITE
+
     args = parse_args(sys.argv[1:])
     mode, params = resolve_mode(args)
 
+    if args.cache_dir:
+        CACHE_DIR = Path(args.cache_dir)
+    CACHE_READ  = not (args.refresh or args.no_cache)
+    CACHE_WRITE = not args.no_cache
+
     out_dir: Path = params["out_dir"]
     (out_dir / "json").mkdir(parents=True, exist_ok=True)
     (out_dir / "py").mkdir(parents=True, exist_ok=True)
 
-    rows_iter: List[Dict[str, str]]
-
-    if mode == "csv":
-        in_csv: Path = params["csv_path"]
-        with in_csv.open(newline="", encoding="utf-8") as fh:
-            rdr = csv.DictReader(fh)
-            if {"asset_name", "url"} - set(rdr.fieldnames or []):
-                log.error("CSV must have headers: asset_name,url")
-                return
-            rows_iter = list(rdr)
-    else:
-        # single asset mode
-        rows_iter = [{"asset_name": params["asset"], "url": params["url"]}]
-
-    for row in rows_iter:
-        asset, orig_url = row["asset_name"].strip(), row["url"].strip()
-        if not asset or not orig_url:
-            log.error("Skipping row with missing asset_name or url: %s", row)
-            continue
-
-        dsid = _dataset_id(orig_url)
-        if not dsid:
-            log.error("⚠️  cannot extract dataset id from %s", orig_url)
-            continue
-
-        host     = urlparse(orig_url).netloc.lower()
-        endpoint = _canonical(host, dsid)
-        meta     = _get_json(_views_meta_url(host, dsid))
-        html     = _get_html(f"https://{host}/d/{dsid}")  # noqa: F841 (html kept for potential future use)
-
-        rows = (
-            _rows_from_header(endpoint)
-            or _rows_from_meta_v1(host, dsid)
-            or _rows_from_meta_v2(meta)
-            or _rows_from_catalog(host, dsid)
-            or _rows_from_count_query(endpoint)
-        )
-        if rows is None:
-            log.warning("⚠️  could not determine row count for %s", dsid)
-
-        size, (cols, buckets) = _asset_size(rows), _bucket_columns(meta.get("columns", []) or [])
-        order_field = f"{random.choice(buckets['date_cols'])} ASC" if buckets['date_cols'] else ""
-
-        # ── write JSON payload ─────────────────────────────────────────
-        payload = {
-            "title":            meta.get("name"),
-            "description":      _strip_html(meta.get("description")),
-            "update_frequency": meta.get("metadata", {}).get("updateFrequency"),
-            "endpoint":         endpoint[:-5],  # strip .json
-            "data_dictionary":  cols,
-            "total_columns":    len(cols),
-            "rows":             rows,
-        }
-        (out_dir / "json" / f"{_slug(payload['title'] or asset)}.json").write_text(
-            json.dumps(payload, indent=2, ensure_ascii=False)
-        )
-
-        # ── generate stub .py asset file ───────────────────────────────
-        rename_var, cfg_var = f"{asset}_rename_map", f"{asset}_schema_cfg"
-        imports: List[str]  = []
-        if size == "single":
-            imports.append("from pipeline.lib.asset_factories import build_single_socrata_asset")
-        elif size == "medium":
-            imports.append("from pipeline.lib.assets.asset_factories import build_medium_socrata_asset")
+    # network-bound: overlap the per-asset HTTP round-trips across rows.
+    # CSV rows are submitted as they are read, so work starts on the first row.
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        if mode == "csv":
+            in_csv: Path = params["csv_path"]
+            with in_csv.open(newline="", encoding="utf-8") as fh:
+                rdr = csv.DictReader(fh)
+                if {"asset_name", "url"} - set(rdr.fieldnames or []):
+                    log.error("CSV must have headers: asset_name,url")
+                    return
+                futures = [
+                    ex.submit(process_row, r, out_dir, fetch_html=args.fetch_html) for r in rdr
+                ]
         else:
-            imports += [
-                "from datetime import datetime",
-                "from pipeline.lib.asset_factories import build_large_socrata_asset",
-            ]
-
-        lines: List[str] = [
-            *imports,
-            "",
-            "from typing import Dict, Any",
-            "",
-            f'TAG_AUTO = {{"domain": "auto", "source": "{host}"}}',
-            "",
-            f"{rename_var}: Dict[str, str] = {{}}",
-            "",
-            f"{cfg_var}: Dict[str, Any] = dict(",
-            f"    rename_map = {rename_var},",
-            f"    date_cols  = {buckets['date_cols']},",
-            f"    int_cols   = {buckets['int_cols']},",
-            f"    float_cols = {buckets['float_cols']},",
-            f"    bool_cols  = {buckets['bool_cols']},",
-            ")",
-            "",
-        ]
-
-        builder_fn = {
-            "single": "build_single_socrata_asset",
-            "medium": "build_medium_socrata_asset",
-            "large":  "build_large_socrata_asset",
-        }[size]
-
-        call = [
-            f"{asset}_raw, {asset} = {builder_fn}(",
-            f'    asset_name = "{asset}",',
-            f'    endpoint   = "{endpoint}",',
-            f'    schema_cfg = {cfg_var},',
-        ]
-        if order_field:
-            call.append(f'    order_field = "{order_field}",')
-        if size == "large":
-            call += [
-                "    # TODO: adjust date window",
-                "    start_date = datetime(2020, 1, 1),",
-                "    end_date   = datetime(2025, 1, 1),",
-            ]
-        call += [
-            "    tags = TAG_AUTO,",
-            ")",
-        ]
-        lines += call
-
-        (out_dir / "py" / f"{asset}.py").write_text("\n".join(lines))
-        log.info("✅  generated asset '%s' (size=%s, rows=%s)", asset, size, rows)
+            # single asset mode
+            row = {"asset_name": params["asset"], "url": params["url"]}
+            futures = [ex.submit(process_row, row, out_dir, fetch_html=args.fetch_html)]
+
+        for f in as_completed(futures):
+            f.result()
 
 if __name__ == "__main__":
     main()
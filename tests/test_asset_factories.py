@@ -0,0 +1,47 @@
+import polars as pl
+import pytest
+
+from pipeline.lib.asset_factories import _auto_transform, _iter_pages
+
+
+def _fake_fetch(total: int, offsets: list[int]):
+    def fetch(endpoint, params, schema=None):
+        offsets.append(params["$offset"])
+        start = params["$offset"]
+        stop = min(total, start + params["$limit"])
+        return pl.DataFrame({"n": list(range(start, stop))}, schema={"n": pl.Int64})
+    return fetch
+
+
+@pytest.mark.parametrize(
+    ("total", "expected_offsets"),
+    [
+        (25, [0, 10, 20]),       # short last page ends paging
+        (10, [0, 10]),           # exact multiple: one empty page, never two
+        (0, [0]),
+    ],
+)
+def test_iter_pages_never_requests_past_the_last_page(total, expected_offsets):
+    offsets: list[int] = []
+
+    pages = list(_iter_pages(_fake_fetch(total, offsets), "e", {}, limit=10))
+
+    assert offsets == expected_offsets
+    assert sum(p.height for p in pages) == total
+
+
+@pytest.mark.parametrize(
+    ("order_field", "expected_columns"),
+    [
+        ("date_column", ["date_column", "value"]),
+        ("created_date", ["date_column", "value", "created_date"]),
+    ],
+)
+def test_auto_transform_injects_missing_order_field_once(order_field, expected_columns):
+    transform = _auto_transform(schema_cfg={}, custom_fn=None, order_field=order_field)
+
+    out = transform(pl.LazyFrame({"value": [1, 2]})).collect()
+
+    assert out.columns == expected_columns
+    assert out.schema["date_column"] == pl.Datetime
+    assert out["date_column"].null_count() == 2
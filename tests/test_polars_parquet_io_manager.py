@@ -0,0 +1,43 @@
+import polars as pl
+
+from pipeline.defs.resources.polars_parquet_io_manager import PolarsParquetIOManager
+
+
+def _nested_frame() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "id": [1, 2, 3],
+            "empty": pl.Series([None, None, None], dtype=pl.String),
+            # struct rows are set, but leaf "loc.y" is all-NULL
+            "loc": [{"x": 1.0, "y": None}, {"x": 2.0, "y": None}, {"x": 3.0, "y": None}],
+            # list leaf "tags.list.element" is all-NULL, counted per element
+            "tags": [[None, None], [None], [None, None, None]],
+        },
+        schema_overrides={
+            "loc": pl.Struct({"x": pl.Float64, "y": pl.String}),
+            "tags": pl.List(pl.String),
+        },
+    )
+
+
+def test_all_null_cols_from_stats_reports_only_flat_columns(tmp_path):
+    path = tmp_path / "chunk.parquet"
+    _nested_frame().write_parquet(path, statistics=True)
+
+    assert PolarsParquetIOManager._all_null_cols_from_stats(str(path)) == {"empty"}
+
+
+def test_all_null_cols_from_stats_without_statistics(tmp_path):
+    path = tmp_path / "chunk.parquet"
+    _nested_frame().write_parquet(path, statistics=False)
+
+    assert PolarsParquetIOManager._all_null_cols_from_stats(str(path)) is None
+
+
+def test_write_chunk_lazy_drops_only_flat_all_null_columns(tmp_path):
+    mgr = PolarsParquetIOManager(base_dir=str(tmp_path), mode="hive_chunk")
+
+    mgr.write_chunk_lazy("asset", 1, _nested_frame().lazy(), year=2024, month=1)
+
+    out = pl.read_parquet(tmp_path / "asset" / "year=2024" / "month=01" / "asset_202401_1.parquet")
+    assert out.columns == ["id", "loc", "tags"]
@@ -0,0 +1,39 @@
+import polars as pl
+import pytest
+
+from pipeline.defs.resources.socrata_resource import SocrataResource
+
+_PINNED = pl.Schema({"a": pl.String, "n": pl.Int64})
+
+
+def _fetch_frame(monkeypatch, endpoint: str, rows: list[dict]) -> pl.DataFrame:
+    if endpoint.endswith(".geojson"):
+        payload = [{"properties": r} for r in rows]
+    else:
+        payload = rows
+    monkeypatch.setattr(SocrataResource, "_fetch_records", lambda self, e, q: payload)
+    return SocrataResource(api_token="test").fetch_frame(endpoint, {}, schema=_PINNED)
+
+
+@pytest.mark.parametrize("endpoint", ["x.json", "x.geojson"])
+def test_fetch_frame_never_narrows_numbers(monkeypatch, endpoint):
+    df = _fetch_frame(monkeypatch, endpoint, [{"a": "x", "n": 1.5}])
+
+    assert df.schema == pl.Schema({"a": pl.String, "n": pl.Float64})
+    assert df["n"].to_list() == [1.5]
+
+
+@pytest.mark.parametrize("endpoint", ["x.json", "x.geojson"])
+def test_fetch_frame_coerces_scalars_in_pinned_columns(monkeypatch, endpoint):
+    df = _fetch_frame(monkeypatch, endpoint, [{"a": True, "n": 1}, {"a": "x", "n": 2}])
+
+    assert df["a"].to_list() == ["true", "x"]
+
+
+@pytest.mark.parametrize("endpoint", ["x.json", "x.geojson"])
+@pytest.mark.parametrize("value", [{"k": 1}, [1, 2]])
+def test_fetch_frame_infers_pages_with_nested_values(monkeypatch, endpoint, value):
+    df = _fetch_frame(monkeypatch, endpoint, [{"a": value, "n": 1}])
+
+    assert df.schema["a"] != pl.String
+    assert df.height == 1
@@ -0,0 +1,32 @@
+import pytest
+
+duckdb = pytest.importorskip("duckdb")
+
+from w import find_first_glob  # noqa: E402
+
+
+def test_find_first_glob_deep_layout_binds_glob_parameter(tmp_path):
+    nested = tmp_path / "asset" / "some" / "dir"
+    nested.mkdir(parents=True)
+    (nested / "part.parquet").touch()
+    (tmp_path / "other" / "x").mkdir(parents=True)
+
+    with duckdb.connect() as con:
+        assert find_first_glob(con, tmp_path, "asset") == (
+            (tmp_path / "asset" / "**" / "*.parquet").as_posix(),
+            "deep",
+        )
+        assert find_first_glob(con, tmp_path, "other") is None
+        assert find_first_glob(con, tmp_path, "missing") is None
+
+
+def test_find_first_glob_prefers_hive_monthly(tmp_path):
+    month = tmp_path / "asset" / "year=2024" / "month=01"
+    month.mkdir(parents=True)
+    (month / "asset_202401_1.parquet").touch()
+
+    with duckdb.connect() as con:
+        pat, kind = find_first_glob(con, tmp_path, "asset")
+
+    assert kind == "hive_monthly"
+    assert pat.endswith("year=*/month=*/*.parquet")
@@ -11,6 +11,8 @@ Build (or rebuild) a DuckDB warehouse from a minimal YAML:
     analytics:  data/opendata/analytics
     warehouse:  data/duckdb/data.duckdb
   search_order: [analytics, clean, raw]   # optional
+  strict_schema: false                     # optional: true, or a list of assets
+                                           # (files must share one schema)
   assets:
     - asset_a
     - asset_b
@@ -22,12 +24,12 @@ to specify partitioning. Creates 1 VIEW per asset (or TABLE with --as-tables).
 from __future__ import annotations
 
 import argparse
-import glob
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Tuple, Dict
+from typing import Iterable, List, Tuple, Dict, FrozenSet
 
 import duckdb
 import yaml
@@ -53,6 +55,7 @@ class Config:
     paths: Dict[str, Path]        # keys: clean, raw, analytics, warehouse
     search_order: List[str]       # e.g., ["analytics", "clean", "raw"]
     assets: List[str]
+    strict_schema: FrozenSet[str] = frozenset()   # assets read without union_by_name
 
 
 def load_config(yaml_path: Path) -> Config:
@@ -83,33 +86,77 @@ def load_config(yaml_path: Path) -> Config:
     if not assets or not isinstance(assets, list) or not all(isinstance(a, str) for a in assets):
         raise ValueError("assets: must be a non-empty list of asset names (strings)")
 
-    return Config(paths=cfg_paths, search_order=search_order, assets=assets)
+    # strict_schema: true → every asset; list → just those. Such assets are read
+    # with the first file's schema instead of unioning every footer by name.
+    strict = data.get("strict_schema") or False
+    if strict is True:
+        strict_schema = frozenset(assets)
+    elif isinstance(strict, list) and all(isinstance(a, str) for a in strict):
+        strict_schema = frozenset(strict)
+    elif strict is False:
+        strict_schema = frozenset()
+    else:
+        raise ValueError("strict_schema: must be true/false or a list of asset names")
+
+    return Config(
+        paths=cfg_paths, search_order=search_order, assets=assets, strict_schema=strict_schema
+    )
+
+
+def _subdirs(path: Path | str, prefix: str) -> List[str]:
+    """Direct sub-directories of `path` whose name starts with `prefix`."""
+    try:
+        with os.scandir(path) as it:
+            return [e.path for e in it if e.name.startswith(prefix) and e.is_dir()]
+    except OSError:
+        return []
+
+
+def _has_parquet(path: Path | str) -> bool:
+    """True if `path` directly contains a *.parquet file (stops at the first hit)."""
+    try:
+        with os.scandir(path) as it:
+            return any(e.name.endswith(".parquet") and e.is_file() for e in it)
+    except OSError:
+        return False
 
 
-def find_first_glob(base: Path, asset: str) -> Tuple[str, str] | None:
+def find_first_glob(
+    con: duckdb.DuckDBPyConnection, base: Path, asset: str
+) -> Tuple[str, str] | None:
     """
-    Try a sequence of patterns under base/asset and return (pattern, kind).
+    Probe base/asset and return (pattern, kind) for the first layout that has data.
     kind is for logging: "hive_monthly", "hive_yearly", "flat", "deep".
+    Probes list direct children only (os.scandir); the recursive "**" pattern is
+    the last resort: DuckDB's glob() expands it (the full listing, at bind
+    time) and the query only checks that it matched at least one file.
+    Only local directories are supported (cfg paths are local).
     """
     root = base / asset
-    candidates: List[Tuple[Path, str]] = [
-        (root / "year=*" / "month=*" / "*.parquet", "hive_monthly"),
-        (root / "year=*" / "*.parquet",            "hive_yearly"),
-        (root / "*.parquet",                       "flat"),
-        (root / "**" / "*.parquet",                "deep"),
-    ]
-    for pat, kind in candidates:
-        pat_str = str(pat.as_posix())
-        if glob.glob(pat_str, recursive=True):
-            return (pat_str, kind)
+    if not root.is_dir():
+        return None
+
+    years = _subdirs(root, "year=")
+    if any(_has_parquet(m) for y in years for m in _subdirs(y, "month=")):
+        return (str((root / "year=*" / "month=*" / "*.parquet").as_posix()), "hive_monthly")
+    if any(_has_parquet(y) for y in years):
+        return (str((root / "year=*" / "*.parquet").as_posix()), "hive_yearly")
+    if _has_parquet(root):
+        return (str((root / "*.parquet").as_posix()), "flat")
+
+    deep = str((root / "**" / "*.parquet").as_posix())
+    if con.execute("SELECT 1 FROM glob(?) LIMIT 1", [deep]).fetchone():
+        return (deep, "deep")
     return None
 
 
-def autodetect_glob(cfg: Config, asset: str) -> Tuple[str, str] | None:
+def autodetect_glob(
+    con: duckdb.DuckDBPyConnection, cfg: Config, asset: str
+) -> Tuple[str, str] | None:
     """Search layers in cfg.search_order and return the first matching (glob, kind)."""
     for layer in cfg.search_order:
         base = cfg.paths[layer]
-        got = find_first_glob(base, asset)
+        got = find_first_glob(con, base, asset)
         if got:
             return got
     return None
@@ -126,34 +173,58 @@ def create_views_or_tables(
     *,
     as_tables: bool,
     verbose: bool,
+    strict_schema: FrozenSet[str] = frozenset(),
 ):
     """
     Create OR REPLACE VIEW/TABLE for each asset.
-    Always sets hive_partitioning=true + union_by_name=true.
+    Always sets hive_partitioning=true; union_by_name=true unless the asset is
+    in `strict_schema` (then only the first file's footer defines the schema,
+    so every file of that asset must have the identical schema – chunked
+    assets usually don't, since all-NULL columns are dropped per chunk).
     Also writes a registry table with (asset_name, parquet_glob, kind).
     """
+    stmt = "TABLE" if as_tables else "VIEW"
+    stmts: List[str] = []
     rows = []
     for asset, pat, kind in items:
-        stmt = "TABLE" if as_tables else "VIEW"
-        sql = f"""
-        CREATE OR REPLACE {stmt} {asset} AS
-        SELECT *
-        FROM read_parquet(
-          '{pat}',
-          hive_partitioning = true,
-          union_by_name     = true
-        );
-        """
-        con.execute(sql)
+        if not as_tables:
+            union = "false" if asset in strict_schema else "true"
+            stmts.append(f"""
+            CREATE OR REPLACE VIEW {asset} AS
+            SELECT *
+            FROM read_parquet(
+              '{pat}',
+              hive_partitioning = true,
+              union_by_name     = {union}
+            )""")
         rows.append((asset, pat, kind))
         if verbose:
             print(f"[+] {stmt:<5} {asset:30s}  ←  {kind:12s}  ({pat})")
 
-    con.execute("DROP TABLE IF EXISTS registry__assets;")
-    con.execute(
-        "CREATE TABLE registry__assets (asset_name TEXT, parquet_glob TEXT, detected_kind TEXT);"
-    )
-    con.executemany("INSERT INTO registry__assets VALUES (?, ?, ?);", rows)
+    # one transaction, one catalog commit for the batch
+    con.execute("BEGIN TRANSACTION;")
+    try:
+        if as_tables:
+            # relation API: the scan plan is built directly, no SQL text to parse
+            for asset, pat, _ in items:
+                con.execute(f"DROP TABLE IF EXISTS {asset};")
+                con.read_parquet(
+                    pat, hive_partitioning=True, union_by_name=asset not in strict_schema
+                ).create(asset)
+        elif stmts:
+            # views stay SQL: relation.create_view() only makes connection-scoped
+            # temporary views, which would not persist in the warehouse file
+            con.execute(";\n".join(stmts) + ";")
+        con.execute("DROP TABLE IF EXISTS registry__assets;")
+        con.execute(
+            "CREATE TABLE registry__assets (asset_name TEXT, parquet_glob TEXT, detected_kind TEXT);"
+        )
+        con.executemany("INSERT INTO registry__assets VALUES (?, ?, ?);", rows)
+        con.execute("COMMIT;")
+    except Exception:
+        con.execute("ROLLBACK;")
+        raise
+
     if verbose:
         print(f"[✓] Registered {len(rows)} {'tables' if as_tables else 'views'}")
 
@@ -191,13 +262,29 @@ def main(argv: Iterable[str]) -> int:
     only = {s.strip() for s in args.only.split(",") if s.strip()} or None
     exclude = {s.strip() for s in args.exclude.split(",") if s.strip()}
 
+    wanted = [
+        a for a in cfg.assets
+        if not (only and a not in only)
+        and not (exclude and any(tok in a for tok in exclude))
+    ]
+
+    # layout detection is independent filesystem I/O per asset → probe in parallel
+    # (in-memory connection so --list never touches the warehouse; one cursor
+    # per probe since a DuckDB connection must not be shared across threads)
+    probe = duckdb.connect()
+
+    def _detect(asset: str) -> Tuple[str, str] | None:
+        with probe.cursor() as cur:
+            return autodetect_glob(cur, cfg, asset)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(32, len(wanted)))) as ex:
+            detected = list(ex.map(_detect, wanted))
+    finally:
+        probe.close()
+
     selected: List[Tuple[str, str, str]] = []
-    for a in cfg.assets:
-        if only and a not in only:
-            continue
-        if exclude and any(tok in a for tok in exclude):
-            continue
-        sel = autodetect_glob(cfg, a)
+    for a, sel in zip(wanted, detected):
         if sel is None:
             if args.verbose:
                 print(f"[-] Skip {a:30s}: no parquet files found in any layer")
@@ -228,7 +315,13 @@ def main(argv: Iterable[str]) -> int:
     con = duckdb.connect(str(tmp), read_only=False)
     try:
         ensure_httpfs(con)
-        create_views_or_tables(con, selected, as_tables=args.as_tables, verbose=args.verbose)
+        create_views_or_tables(
+            con,
+            selected,
+            as_tables=args.as_tables,
+            verbose=args.verbose,
+            strict_schema=cfg.strict_schema,
+        )
     finally:
         con.close()
 